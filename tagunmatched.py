@@ -1,196 +1,425 @@
 #!/usr/bin/env python3
 import sys
+import os
+import json
 import argparse
+import glob
+import re
+import tempfile
 import unittest
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from typing import Set
 
-# PyYAML のインポート
-import yaml
-
 # 例外クラスの定義
+# stack はコピーせず参照のまま保持するので、呼び出し側で変更しないこと。
 class DSLSyntaxError(Exception):
   def __init__(self, line: int, col: int, message: str, stack: list):
     self.line = line
     self.col = col
     self.message = message
     self.stack = stack
-    super().__init__(f"at line {line}, char {col}: {message} (Stack: {stack})")
+    # メッセージの整形は __str__ まで遅らせる（args には整形前の値を渡す）
+    super().__init__(line, col, message, stack)
 
   def __str__(self):
     return f"at line {self.line}, char {self.col}: {self.message} (Stack: {self.stack})"
 
-# シンタックスチェッカー本体
+# 空白文字（4 文字程度なら frozenset より str の in のほうが速い）
+_WS_CHARS = ' \t\n\r'
+
+# ASCII 文字の種別テーブル（コードポイントで引く）
+_TAGNAME_START = 2   # タグ名の先頭文字: [#a-zA-Z0-9]
+_TAGNAME_CONT = 4    # タグ名の 2 文字目以降: [#a-zA-Z0-9_-]
+
+def _build_char_class() -> bytearray:
+  table = bytearray(128)
+  for c in range(128):
+    if chr(c).isalnum() or chr(c) == '#':
+      table[c] |= _TAGNAME_START | _TAGNAME_CONT
+  for ch in '_-':
+    table[ord(ch)] |= _TAGNAME_CONT
+  return table
+
+_CLASS = _build_char_class()
+
+# 文書を字句に分割する正規表現。どの文字もいずれかの字句に必ず含まれる。
+#   bq:    バッククオートとそれがエスケープする 1 文字（末尾なら単独）
+#   tag:   引数のないタグ全体 '[name]' または '[/name]'（タグ名の検証は別途行う）
+#   open:  それ以外のタグの開始 '[' または '[/'
+#   close: ']'
+#   quote: '"'
+#   text:  上記以外の文字の並び
+_TOK = re.compile(r'(?P<bq>`.?)|(?P<tag>\[/?[^\[\]"` \t\n\r]+\])|(?P<open>\[/?)|(?P<close>\])|(?P<quote>")|(?P<text>[^\[\]"`]+)', re.DOTALL)
+
+# タグ種別の表で単一タグを表す値（グループタグは 0 以上の ID）
+_SINGLE_TAG = -1
+
+# _check のタグスタックの初期容量（足りなくなったら倍にする）
+_INIT_DEPTH = 64
+
+# _check の状態
+_TEXT = 0    # タグ外
+_NAME = 1    # '[' または '[/' の直後（タグ名待ち）
+_ARGS = 2    # タグ名の後ろ（引数または ']' 待ち）
+_QUOTED = 3  # ダブルクオートで囲まれた引数の中
+
+# タグ名をパースする。p はタグ名の先頭を指していること。
+# 戻り値は (エラーメッセージ または None, タグ名, pos)
+def _parse_tag_name(code: str, p: int):
+  n = len(code)
+  cls = _CLASS
+  # タグ名のパース
+  start = p
+  if p >= n:
+    return "タグ名がありません", None, p
+  ch = code[p]
+  if ch == '`':
+    return "タグ名にバッククオートが現れました", None, p
+  # タグ名の最初の文字は [#a-zA-Z0-9] である必要がございます（ASCII のみ）
+  c = ord(ch)
+  if not (c < 128 and cls[c] & _TAGNAME_START):
+    return "タグ名の先頭文字が不正です", None, p
+  p += 1
+
+  # タグ名の残りは [#a-zA-Z0-9_-]* とする
+  while p < n and (c := ord(code[p])) < 128 and cls[c] & _TAGNAME_CONT:
+    p += 1
+  tag_name = code[start:p]
+
+  # タグ名の直後は空白か ']' でなければならない
+  if p >= n:
+    return "タグ名の途中で文字列が終了しました", None, p
+  ch = code[p]
+  if ch == '`':
+    return "タグ名にバッククオートが現れました", None, p
+  if ch != ']' and ch not in _WS_CHARS:
+    return "タグ名に不正な文字が含まれています", None, p
+  return None, tag_name, p
+
+# Numba 用のタグ名エンコード。
+# タグ名の各文字を 1〜65 の数値に対応させ、66 進数として int64 に詰める。
+# 10 文字までなら衝突なく表現できる（66**10 < 2**63）。
+_NAME_DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#_-'
+_NAME_BASE = len(_NAME_DIGITS) + 1
+_NAME_MAX_LEN = 10
+_NAME_DIGIT = bytearray(256)
+for _i, _ch in enumerate(_NAME_DIGITS):
+  _NAME_DIGIT[ord(_ch)] = _i + 1
+_NAME_START_MAX = _NAME_DIGIT[ord('#')]  # '_' と '-' は先頭に置けない
+
+# タグ名を _scan 用の整数に変換する。表現できない場合は -1 を返す
+def _tag_code(name: str) -> int:
+  if not 0 < len(name) <= _NAME_MAX_LEN or not name.isascii():
+    return -1
+  code = 0
+  for ch in name:
+    v = _NAME_DIGIT[ord(ch)]
+    if v == 0:
+      return -1
+    code = code * _NAME_BASE + v
+  return code
+
+# Numba は任意の依存。起動時間を増やさないよう、最初のチェックのときに読み込む。
+# np と _NAME_DIGIT_ARRAY は _load_numba が設定する（_scan はそれらを参照してコンパイルされる）
+np = None
+_NAME_DIGIT_ARRAY = None
+_scan_kernel = None  # コンパイル済みの _scan。未ロードなら None、Numba がなければ False
+
+# Numba と NumPy の読み込みには 0.3〜0.4 秒かかる。Python 版の走査は 1 文字あたり約 0.2 µs なので、
+# 読み込みの元が取れるのはおよそ 200 万文字から。それより短い文書は読み込まずに Python 版で走査する
+_SCAN_MIN_LEN = 1 << 21
+
+# Numba と NumPy を読み込み、使えれば True を返す（2 回目以降は結果を返すだけ）
+def _load_numba() -> bool:
+  global np, _NAME_DIGIT_ARRAY, _scan_kernel
+  if _scan_kernel is None:
+    try:
+      import numpy
+      from numba import njit
+    except ImportError:
+      _scan_kernel = False
+    else:
+      np = numpy
+      _NAME_DIGIT_ARRAY = np.frombuffer(bytes(_NAME_DIGIT), dtype=np.uint8)
+      _scan_kernel = njit(cache=True)(_scan)
+  return _scan_kernel is not False
+
+# UTF-8 バイト列を走査し、構文が正しいことを確認できれば True を返す。
+# False はエラーまたは判定不能（長すぎるタグ名）を意味し、
+# 呼び出し側で Python 版の走査をやり直して詳細を得る
+def _scan(buf, single_codes, group_codes, stack):
+  digit = _NAME_DIGIT_ARRAY
+  n = buf.shape[0]
+  p = 0
+  top = 0
+  while p < n:
+    b = buf[p]
+    if b == 0x60:  # '`'
+      if p + 1 >= n:
+        return False
+      p += 2
+      continue
+    if b != 0x5B:  # '['
+      p += 1
+      continue
+
+    # タグ開始
+    p += 1
+    closing = False
+    if p < n and buf[p] == 0x2F:  # '/'
+      closing = True
+      p += 1
+    if p >= n:
+      return False
+    v = digit[buf[p]]
+    if v == 0 or v > _NAME_START_MAX:
+      return False
+    code = np.int64(v)
+    length = 1
+    p += 1
+    while p < n:
+      v = digit[buf[p]]
+      if v == 0:
+        break
+      if length == _NAME_MAX_LEN:
+        return False
+      code = code * _NAME_BASE + v
+      length += 1
+      p += 1
+    if p >= n:
+      return False
+    b = buf[p]
+    if b != 0x5D and b != 0x20 and b != 0x09 and b != 0x0A and b != 0x0D:
+      return False
+
+    # 引数
+    while p < n:
+      b = buf[p]
+      if b == 0x5D:  # ']'
+        break
+      if b == 0x22:  # '"'
+        p += 1
+        while True:
+          if p >= n:
+            return False
+          b = buf[p]
+          if b == 0x60:
+            if p + 1 >= n:
+              return False
+            p += 2
+            continue
+          p += 1
+          if b == 0x22:
+            break
+      elif b == 0x60:
+        if p + 1 >= n:
+          return False
+        p += 2
+      elif b == 0x5B:
+        return False
+      else:
+        p += 1
+    if p >= n:
+      return False
+    p += 1  # ']' を消費
+
+    # タグ種別に応じた処理
+    i = np.searchsorted(single_codes, code)
+    is_single = i < single_codes.shape[0] and single_codes[i] == code
+    if closing:
+      if is_single or top == 0:
+        return False
+      top -= 1
+      if stack[top] != code:
+        return False
+    elif not is_single:
+      i = np.searchsorted(group_codes, code)
+      if i >= group_codes.shape[0] or group_codes[i] != code:
+        return False
+      stack[top] = code
+      top += 1
+  return top == 0
+
+def _encode_tag_set(tags: frozenset):
+  codes = set(map(_tag_code, tags))
+  codes.discard(-1)
+  return np.array(sorted(codes), dtype=np.int64)
+
+# _scan に渡す (単一タグのコード配列, グループタグのコード配列) を作る。
+# 同じ設定なら作り直さないようキャッシュする。_load_numba() が True を返したあとに呼ぶこと。
+# 両方に含まれるタグは単一タグとして扱う
+@lru_cache(maxsize=16)
+def _encode_tag_codes(single_tags: frozenset, group_tags: frozenset):
+  return _encode_tag_set(single_tags), _encode_tag_set(group_tags - single_tags)
+
+def _scan_ok(code: str, tag_codes) -> bool:
+  buf = np.frombuffer(code.encode('utf-8'), dtype=np.uint8)
+  stack = np.empty(code.count('[') + 1, dtype=np.int64)
+  return _scan_kernel(buf, *tag_codes, stack)
+
+# タグ種別に応じてスタックを操作する（スタックにはタグ名ではなくタグ ID を積む）。
+# kind は tag_kind を引いた結果（_SINGLE_TAG、グループタグの ID、未知のタグなら None）。
+# stack は int の配列で、stack[:top] が積まれている部分。
+# 戻り値は (エラーメッセージ または None, 新しい top)
+def _apply_tag(closing: bool, tag_name: str, kind, tag_names: list, stack: array, top: int):
+  if closing:
+    if kind == _SINGLE_TAG:
+      return f"閉じタグが不要なタグ [/{tag_name}] が現れました", top
+    if top == 0:
+      return f"閉じタグ [/{tag_name}] に対応する開始タグがありません", top
+    top -= 1
+    last_id = stack[top]
+    if last_id != kind:
+      return f"閉じタグ [/{tag_name}] が直前の開始タグ [{tag_names[last_id]}] と一致しません", top
+  elif kind is None:
+    return f"未知のタグ [{tag_name}] が現れました", top
+  elif kind != _SINGLE_TAG:
+    if top == len(stack):
+      stack.extend(array('i', [0]) * len(stack))  # 容量を倍にする
+    stack[top] = kind
+    top += 1
+  # 単一タグの場合はスタックに積まない
+  return None, top
+
+# 文書全体をチェックする。
+# 行・桁は数えず位置 pos だけを追う（行・桁はエラー時に SyntaxChecker._locate で求める）。
+# 戻り値は (エラーメッセージ または None, pos, タグ ID のスタック, スタックの深さ)
+# tag_codes は _encode_tag_codes の結果（Numba が使えない場合は None）。
+def _check(code: str, tag_kind: dict, tag_names: list, tag_codes=None):
+  # Numba が使えれば先に高速パスで確認し、正しければそのまま終了位置を返す
+  if tag_codes is not None and _scan_ok(code, tag_codes):
+    return None, len(code), array('i'), 0
+
+  p = 0
+  # グループタグ ID のスタック（固定長の int 配列と深さ top で管理する）
+  stack = array('i', [0]) * _INIT_DEPTH
+  top = 0
+  state = _TEXT
+  closing = False
+  tag_name = None
+  tag_cache = {}  # 引数のないタグの字句 -> (閉じタグか, タグ名, タグ種別)
+  for m in _TOK.finditer(code):
+    kind = m.lastgroup
+    e = m.end()
+    if state == _TEXT:
+      if kind == 'tag':
+        # 引数のないタグ [name] / [/name]。同じ字句の解析結果は使い回す
+        tok = m.group()
+        hit = tag_cache.get(tok)
+        if hit is None:
+          closing = tok[1] == '/'
+          message, tag_name, q = _parse_tag_name(code, p + 1 + closing)
+          if message is not None:
+            return message, q, stack, top
+          hit = tag_cache[tok] = (closing, tag_name, tag_kind.get(tag_name))
+        message, top = _apply_tag(*hit, tag_names, stack, top)
+        if message is not None:
+          return message, e, stack, top
+      elif kind == 'open':
+        # 未エスケープの '[' はタグ開始とみなす。'[/' なら閉じタグ
+        closing = e - p == 2
+        state = _NAME
+      elif kind == 'bq' and e - p == 1:
+        return "単独のバッククオートが末尾に現れました", e, stack, top
+      # それ以外（エスケープされた文字や ']' '"' を含む）はただのテキスト
+
+    elif state == _NAME:
+      # タグ名はこのトークンの先頭から始まる。
+      # タグ名の後ろ（空白と引数）はこのトークンの残りとして読み進める
+      message, tag_name, q = _parse_tag_name(code, p)
+      if message is not None:
+        return message, q, stack, top
+      state = _ARGS
+
+    elif state == _ARGS:
+      if kind == 'close':
+        state = _TEXT
+        message, top = _apply_tag(closing, tag_name, tag_kind.get(tag_name), tag_names, stack, top)
+        if message is not None:
+          return message, e, stack, top
+      elif kind == 'open' or kind == 'tag':
+        # エスケープされていない '[' はエラー
+        return "非引用内の引数でエスケープされていない '[' が現れました", p, stack, top
+      elif kind == 'quote':
+        state = _QUOTED
+      elif kind == 'bq' and e - p == 1:
+        return "単独のバッククオートが末尾に現れました (非引用内)", e, stack, top
+
+    else:  # _QUOTED
+      if kind == 'quote':
+        state = _ARGS
+      elif kind == 'bq' and e - p == 1:
+        return "単独のバッククオートが末尾に現れました (引用内)", e, stack, top
+      # '[' や ']' を含め、それ以外はただの文字
+
+    p = e
+
+  # 文字列終了時の状態に応じたエラー
+  if state == _NAME:
+    return _parse_tag_name(code, p)[0], p, stack, top
+  if state == _ARGS:
+    return "タグの終了記号 ']' が見つかりません", p, stack, top
+  if state == _QUOTED:
+    return "引用された引数が閉じられていません", p, stack, top
+  # 未閉じタグが残っていればエラー
+  if top:
+    return "閉じられていないタグが残っています", p, stack, top
+  return None, p, stack, top
+
+# 例外を送出しない場合に表示するエラー文（開いているタグがあれば 2 行目に表示）
+def _format_error(line: int, col: int, message: str, stack: list) -> str:
+  err_msg = f"at line {line}, char {col}: {message}"
+  if stack:
+    err_msg += "\n" + ' > '.join(stack)
+  return err_msg
+
+# シンタックスチェッカー本体（_check の薄いラッパー）
 class SyntaxChecker:
   def __init__(self, code: str, single_tags: Set[str], group_tags: Set[str], raise_exception: bool = False):
     self.code = code
     self.single_tags = single_tags
     self.group_tags = group_tags
+    # タグ名 -> 種別の表。1 回引くだけで単一タグ・グループタグ・未知のタグを区別できる。
+    # グループタグは小さな整数 ID（スタックに積む値）、単一タグは _SINGLE_TAG。
+    # 両方に含まれるタグは従来どおり単一タグとして扱う
+    self._tag_names = sorted(group_tags)
+    self._tag_kind = {name: i for i, name in enumerate(self._tag_names)}
+    self._tag_kind.update(dict.fromkeys(single_tags, _SINGLE_TAG))
+    # Numba の高速パス用のタグコード（短い文書や Numba が使えない場合は None）
+    self._tag_codes = None
+    if len(code) >= _SCAN_MIN_LEN and _load_numba():
+      self._tag_codes = _encode_tag_codes(frozenset(single_tags), frozenset(group_tags))
     self.pos = 0
     self.line = 1
     self.col = 1
     self.stack = []  # グループタグのスタック
     self.raise_exception = raise_exception
 
-  def current_char(self):
-    if self.pos < len(self.code):
-      return self.code[self.pos]
-    return None
-
-  def advance(self):
-    ch = self.code[self.pos]
-    self.pos += 1
-    if ch == '\n':
-      self.line += 1
-      self.col = 1
-    else:
-      self.col += 1
-    return ch
+  def _locate(self, pos=None):
+    # pos（省略時は self.pos）の行・桁を求める。エラー時にだけ呼ばれる
+    p = self.pos if pos is None else pos
+    line = self.code.count('\n', 0, p) + 1
+    last_nl = self.code.rfind('\n', 0, p)
+    col = p - last_nl if last_nl != -1 else p + 1
+    return line, col
 
   def error(self, message: str) -> bool:
-    err_msg = f"at line {self.line}, char {self.col}: {message}"
+    self.line, self.col = self._locate()
     if self.raise_exception:
-      raise DSLSyntaxError(self.line, self.col, message, list(self.stack))
+      raise DSLSyntaxError(self.line, self.col, message, self.stack)
     else:
-      print(err_msg)
-      print(self.stack)
+      print(_format_error(self.line, self.col, message, self.stack))
       return False
 
   def check(self) -> bool:
-    while self.pos < len(self.code):
-      ch = self.current_char()
-      # タグ外や通常テキスト中のバッククオートによるエスケープ処理
-      if ch == '`':
-        self.advance()  # バッククオートを消費
-        if self.current_char() is None:
-          return self.error("単独のバッククオートが末尾に現れました")
-        # 次の1文字は特殊機能を打ち消してただの文字として扱う
-        self.advance()
-        continue
-
-      if ch == '[':
-        # 未エスケープの '[' はタグ開始とみなす
-        if not self.parse_tag():
-          return False
-        continue
-
-      # タグ外の文字はそのまま消費
-      self.advance()
-
-    # 文字列終了時に未閉じタグが残っていればエラー
-    if self.stack:
-      return self.error("閉じられていないタグが残っています")
-    return True
-
-  def is_whitespace(self, ch: str) -> bool:
-    return ch in [' ', '\t', '\n', '\r']
-
-  def skip_whitespace(self):
-    while self.current_char() is not None and self.is_whitespace(self.current_char()):
-      self.advance()
-
-  def parse_tag(self) -> bool:
-    # 現在の文字は '[' と仮定
-    self.advance()  # '[' を消費
-
-    # 閉じタグかどうかの判定
-    is_closing = False
-    if self.current_char() == '/':
-      is_closing = True
-      self.advance()  # '/' を消費
-
-    # タグ名のパース
-    tag_name = ""
-    ch = self.current_char()
-    if ch is None:
-      return self.error("タグ名がありません")
-    if ch == '`':
-      return self.error("タグ名にバッククオートが現れました")
-    # タグ名の最初の文字は [#a-zA-Z0-9] である必要がございます
-    if not (ch.isalnum() or ch == '#'):
-      return self.error("タグ名の先頭文字が不正です")
-    tag_name += ch
-    self.advance()
-
-    # タグ名の残りは [#a-zA-Z0-9_-]* とする
-    while True:
-      ch = self.current_char()
-      if ch is None:
-        return self.error("タグ名の途中で文字列が終了しました")
-      if self.is_whitespace(ch) or ch == ']':
-        break
-      if ch == '`':
-        return self.error("タグ名にバッククオートが現れました")
-      if not (ch.isalnum() or ch in ['#', '_', '-']):
-        return self.error("タグ名に不正な文字が含まれています")
-      tag_name += ch
-      self.advance()
-
-    # タグ名と引数の間の空白（エスケープされていないもの）を消費
-    self.skip_whitespace()
-
-    # 引数のパース
-    while self.current_char() is not None and self.current_char() != ']':
-      # 連続する空白はひとつの区切りとして扱う
-      if self.is_whitespace(self.current_char()):
-        self.skip_whitespace()
-        if self.current_char() == ']':
-          break
-        # 次の引数へ
-      # 引数のパース開始
-      if self.current_char() == '"':
-        # ダブルクオートで囲まれた引数
-        self.advance()  # 開始の " を消費
-        while True:
-          ch = self.current_char()
-          if ch is None:
-            return self.error("引用された引数が閉じられていません")
-          if ch == '`':
-            self.advance()
-            if self.current_char() is None:
-              return self.error("単独のバッククオートが末尾に現れました (引用内)")
-            # バッククオートは次の文字を通常文字として扱う
-            self.advance()
-            continue
-          if ch == '"':
-            self.advance()  # 終了の " を消費
-            break
-          self.advance()
-      else:
-        # ダブルクオートで囲まれていない引数
-        ch = self.current_char()
-        if ch == '`':
-          self.advance()
-          if self.current_char() is None:
-            return self.error("単独のバッククオートが末尾に現れました (非引用内)")
-          self.advance()
-          continue
-        # エスケープされていない '[' はエラー
-        if ch == '[':
-          return self.error("非引用内の引数でエスケープされていない '[' が現れました")
-        self.advance()
-
-    # 引数パース終了後、タグの終了記号 ']' がなければエラー
-    if self.current_char() != ']':
-      return self.error("タグの終了記号 ']' が見つかりません")
-    self.advance()  # ']' を消費
-
-    # タグ種別に応じた処理
-    if is_closing:
-      if tag_name in self.single_tags:
-        return self.error(f"閉じタグが不要なタグ [/{tag_name}] が現れました")
-      if not self.stack:
-        return self.error(f"閉じタグ [/{tag_name}] に対応する開始タグがありません")
-      last_tag = self.stack.pop()
-      if last_tag != tag_name:
-        return self.error(f"閉じタグ [/{tag_name}] が直前の開始タグ [{last_tag}] と一致しません")
-    else:
-      if tag_name in self.single_tags:
-        # 単一タグの場合はスタックに積まない
-        pass
-      elif tag_name in self.group_tags:
-        self.stack.append(tag_name)
-      else:
-        return self.error(f"未知のタグ [{tag_name}] が現れました")
+    message, self.pos, stack, top = _check(
+      self.code, self._tag_kind, self._tag_names, self._tag_codes)
+    self.stack = [self._tag_names[stack[i]] for i in range(top)]
+    if message is not None:
+      return self.error(message)
     return True
 
 # エントリポイントの関数
@@ -198,6 +427,89 @@ def check_syntax(dsl_code: str, single_tags: Set[str], group_tags: Set[str], rai
   checker = SyntaxChecker(dsl_code, single_tags, group_tags, raise_exception)
   return checker.check()
 
+# 高速判定用の字句。タグは引数まで含めて 1 字句にまとめる
+_FAST_TOK = re.compile(r'''
+    [^\[`]+                                              # タグ外のテキスト
+  | `.                                                   # エスケープ
+  | \[(/?)([#0-9A-Za-z][#0-9A-Za-z_-]*)                  # タグ名
+    (?:[ \t\n\r](?:[^\[\]"`]|`.|"(?:[^"`]|`.)*")*)?       # 引数
+    \]
+''', re.DOTALL | re.VERBOSE)
+
+# 正しい文書を高速に判定するエントリポイントの関数。
+# タグとテキストの並びを正規表現で切り出し、スタックの整合だけを確かめる。
+# 少しでも食い違えば check_syntax でやり直し、正確なエラー位置を報告する。
+# 長い文書で Numba が使える場合は check_syntax の _scan の方が速いので、最初から check_syntax に任せる。
+def check_syntax_fast(dsl_code: str, single_tags: Set[str], group_tags: Set[str], raise_exception: bool = False) -> bool:
+  if len(dsl_code) >= _SCAN_MIN_LEN and _load_numba():
+    return check_syntax(dsl_code, single_tags, group_tags, raise_exception)
+  p = 0
+  stack = []
+  for m in _FAST_TOK.finditer(dsl_code):
+    if m.start() != p:
+      break  # どの字句にも当てはまらない部分があった
+    p = m.end()
+    tag_name = m.group(2)
+    if tag_name is None:
+      continue
+    if m.group(1):
+      if tag_name in single_tags or not stack or stack.pop() != tag_name:
+        break
+    elif tag_name in group_tags:
+      stack.append(tag_name)
+    elif tag_name not in single_tags:
+      break
+  else:
+    if p == len(dsl_code) and not stack:
+      return True
+  return check_syntax(dsl_code, single_tags, group_tags, raise_exception)
+
+# 設定ファイルのキャッシュ（YAML の解析結果を JSON で保存したもの）の拡張子
+CONFIG_CACHE_SUFFIX = ".cache.json"
+
+# 設定用 YAML ファイルを読み込む関数。
+# YAML の解析結果は YAML の更新時刻 (st_mtime_ns) とサイズとともに
+# path + CONFIG_CACHE_SUFFIX に JSON で保存する。次回以降は、保存した更新時刻と
+# サイズが現在の YAML と完全に一致する場合だけ、PyYAML を使わずにそちらを読む
+def load_config(path: str):
+  cache_path = path + CONFIG_CACHE_SUFFIX
+  st = os.stat(path)
+  try:
+    with open(cache_path, "r", encoding="utf-8") as cache_file:
+      cache = json.load(cache_file)
+    if cache["yaml_mtime_ns"] == st.st_mtime_ns and cache["yaml_size"] == st.st_size:
+      return cache["config"]
+  except (OSError, ValueError, TypeError, KeyError):
+    pass  # キャッシュがない・壊れている場合は YAML を読む
+
+  # PyYAML はキャッシュが使えないときだけインポートする（C 実装のローダーを優先）
+  import yaml
+  try:
+    from yaml import CSafeLoader as SafeLoader
+  except ImportError:
+    from yaml import SafeLoader
+  with open(path, "r", encoding="utf-8") as config_file:
+    config = yaml.load(config_file, Loader=SafeLoader)
+
+  # 一時ファイルに書いてから置き換えるので、並行して読む側が書きかけのファイルを見ることはない。
+  # キャッシュの書き込みに失敗しても設定の読み込み自体は成功とする
+  tmp_path = None
+  try:
+    cache_text = json.dumps({"yaml_mtime_ns": st.st_mtime_ns, "yaml_size": st.st_size, "config": config},
+                            ensure_ascii=False)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)),
+                                    prefix=os.path.basename(cache_path) + ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+      cache_file.write(cache_text)
+    os.replace(tmp_path, cache_path)
+  except (OSError, TypeError, ValueError):
+    if tmp_path is not None:
+      try:
+        os.remove(tmp_path)
+      except OSError:
+        pass
+  return config
+
 
 ##############################
 # unittest を用いたテストケース群（以前のテストケース群）
@@ -239,6 +551,12 @@ class TestSyntaxChecker(unittest.TestCase):
     with self.assertRaises(DSLSyntaxError):
       check_syntax(code, self.single, self.group, raise_exception=True)
 
+  def test_non_ascii_tag_name(self):
+    code = "[太字]テスト[/太字]"
+    with self.assertRaises(DSLSyntaxError) as cm:
+      check_syntax(code, self.single, self.group | {"太字"}, raise_exception=True)
+    self.assertEqual(cm.exception.message, "タグ名の先頭文字が不正です")
+
   def test_backquote_in_tag_name(self):
     code = "[b`]テスト[/b]"
     with self.assertRaises(DSLSyntaxError):
@@ -268,6 +586,13 @@ class TestSyntaxChecker(unittest.TestCase):
     with self.assertRaises(DSLSyntaxError):
       check_syntax(code, self.single, self.group, raise_exception=True)
 
+  def test_deeply_nested_tags(self):
+    code = "[b]" * 200 + "深い" + "[/b]" * 200
+    self.assertTrue(check_syntax(code, self.single, self.group))
+    with self.assertRaises(DSLSyntaxError) as cm:
+      check_syntax(code[:-4], self.single, self.group, raise_exception=True)
+    self.assertEqual(cm.exception.stack, ["b"])
+
   def test_single_argument_with_escaped_quote(self):
     code = r'[b "arg with escaped quote: `""][/b]'
     self.assertTrue(check_syntax(code, self.single, self.group))
@@ -284,20 +609,178 @@ class TestSyntaxChecker(unittest.TestCase):
     code = r'[br sep=" "]'
     self.assertTrue(check_syntax(code, self.single, self.group, raise_exception=True))
 
+  def test_unterminated_tag_after_argument(self):
+    code = '[b "arg" '
+    with self.assertRaises(DSLSyntaxError):
+      check_syntax(code, self.single, self.group, raise_exception=True)
+
+  def test_repeated_close_tag(self):
+    code = "[b]一[/b][b]二[/b][/b]"
+    with self.assertRaises(DSLSyntaxError) as cm:
+      check_syntax(code, self.single, self.group, raise_exception=True)
+    self.assertEqual(cm.exception.col, 21)
+
+  def test_error_message_format(self):
+    with self.assertRaises(DSLSyntaxError) as cm:
+      check_syntax("[b]テスト", self.single, self.group, raise_exception=True)
+    self.assertEqual(str(cm.exception), "at line 1, char 7: 閉じられていないタグが残っています (Stack: ['b'])")
+
+  def test_error_position_after_newlines(self):
+    code = "一行目\n二行目[/b]"
+    with self.assertRaises(DSLSyntaxError) as cm:
+      check_syntax(code, self.single, self.group, raise_exception=True)
+    self.assertEqual((cm.exception.line, cm.exception.col), (2, 8))
+
   def test_text_with_escaped_brackets(self):
     code = r'This is a text with an escaped bracket: `[` and `].'
     self.assertTrue(check_syntax(code, self.single, self.group))
 
+  def test_tag_code(self):
+    # 10 文字までは表現でき、11 文字以上は -1
+    self.assertGreater(_tag_code("a" * 10), 0)
+    self.assertEqual(_tag_code("a" * 11), -1)
+    # 先頭文字も含め、タグ名に使える文字は表現できる（先頭の '_' '-' は _scan 側で弾く）
+    self.assertGreater(_tag_code("_b"), 0)
+    self.assertGreater(_tag_code("-b"), 0)
+    self.assertGreater(_NAME_DIGIT[ord("_")], _NAME_START_MAX)
+    self.assertGreater(_NAME_DIGIT[ord("-")], _NAME_START_MAX)
+    # 非 ASCII・使えない文字・空文字列は -1
+    self.assertEqual(_tag_code("太字"), -1)
+    self.assertEqual(_tag_code("b!"), -1)
+    self.assertEqual(_tag_code(""), -1)
+    # 接頭辞が同じでも異なるコードになる
+    names = ["b", "b0", "b00", "0", "00", "#", "zzzzzzzzzz", "b-", "b_"]
+    codes = [_tag_code(name) for name in names]
+    self.assertEqual(len(set(codes)), len(names))
+
+  def test_scan_agrees_with_check(self):
+    # Numba 版の _scan と Python 版の _check が同じ入力で同じ判定をすること
+    if not _load_numba():
+      self.skipTest("Numba が使えない")
+    import random
+    checker = SyntaxChecker("", self.single, self.group)
+    tag_codes = _encode_tag_codes(frozenset(self.single), frozenset(self.group))
+    def python_ok(code):
+      return _check(code, checker._tag_kind, checker._tag_names, None)[0] is None
+    pieces = ["[b]", "[/b]", "[i]", "[/i]", "[br]", "[/br]", "[u a]", "[x]", "[_b]", "[b!]",
+              '[b "a]`"b"]', "[b `[]", "[", "]", "[/", "`", "``", '"', " ", "\n", "a", "太字", "[太]"]
+    rng = random.Random(0)
+    codes = [r'[b arg1 "arg2 `"[x]"]太字[/b][br]`[[i][u]下線[/u][/i]', "", "`", "[b]" * 100 + "[/b]" * 100]
+    codes += ["".join(rng.choices(pieces, k=rng.randint(1, 12))) for _ in range(3000)]
+    # 正しい文書が多く生成されるよう、入れ子になったタグだけを並べたもの
+    for _ in range(1000):
+      code = "a"
+      for _ in range(rng.randint(1, 4)):
+        tag = rng.choice(["b", "i", "u"])
+        args = rng.choice(["", " x", ' "`]"'])
+        code = f"[{tag}{args}]{code}`[[br][/{tag}]" + rng.choice(["", "太字"])
+      codes.append(code)
+    for code in codes:
+      self.assertEqual(_scan_ok(code, tag_codes), python_ok(code), code)
+    # 11 文字以上のタグ名は _scan では判定できず、Python 版に任せる
+    long_name = "a" * 11
+    long_codes = _encode_tag_codes(frozenset(self.single), frozenset(self.group | {long_name}))
+    self.assertFalse(_scan_ok(f"[{long_name}][/{long_name}]", long_codes))
+
+  def test_fast_check(self):
+    code = r'[b arg1 "arg2 `"[x]"]太字[/b][br]`[[i][u]下線[/u][/i]'
+    self.assertTrue(check_syntax_fast(code, self.single, self.group))
+    for code in ["[b]テスト", "[b]テスト[/i]", "[b arg[illegal]]", "末尾`"]:
+      with self.assertRaises(DSLSyntaxError):
+        check_syntax_fast(code, self.single, self.group, raise_exception=True)
+
+  def test_fast_check_tier_order(self):
+    from unittest import mock
+    # 長い文書で Numba があれば check_syntax に直接渡す
+    code = "[b]太字[/b]"
+    with mock.patch(f"{__name__}._SCAN_MIN_LEN", 0), \
+         mock.patch(f"{__name__}._load_numba", return_value=True), \
+         mock.patch(f"{__name__}.check_syntax", return_value=True) as slow:
+      self.assertTrue(check_syntax_fast(code, self.single, self.group))
+    slow.assert_called_once_with(code, self.single, self.group, False)
+    # Numba がない場合や短い文書では、正しい文書は正規表現の段だけで判定する
+    for numba_available in (False, True):
+      with mock.patch(f"{__name__}._load_numba", return_value=numba_available), \
+           mock.patch(f"{__name__}.check_syntax") as slow:
+        self.assertTrue(check_syntax_fast(code, self.single, self.group))
+      slow.assert_not_called()
+
+  def test_check_file(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      valid = os.path.join(tmpdir, "valid.txt")
+      invalid = os.path.join(tmpdir, "invalid.txt")
+      missing = os.path.join(tmpdir, "missing.txt")
+      with open(valid, "w", encoding="utf-8") as f:
+        f.write("[b]太字[/b]")
+      with open(invalid, "w", encoding="utf-8") as f:
+        f.write("[b][i]テスト")
+      self.assertEqual(_check_file(valid, self.single, self.group), (valid, True, None, False))
+      self.assertEqual(_check_file(invalid, self.single, self.group),
+                       (invalid, False, "at line 1, char 10: 閉じられていないタグが残っています\nb > i", False))
+      path, result, err_msg, io_error = _check_file(missing, self.single, self.group)
+      self.assertEqual((path, result, io_error), (missing, False, True))
+      self.assertTrue(err_msg.startswith("入力ファイルの読み込みに失敗しました"))
+
+  def _write_config(self, path: str, group_tags: str):
+    with open(path, "w", encoding="utf-8") as f:
+      f.write(f"syntax:\n  single_tags: [br]\n  group_tags: [{group_tags}]\n")
+
+  def test_load_config_writes_and_reads_cache(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      path = os.path.join(tmpdir, "syntax-config.yaml")
+      self._write_config(path, "b, i")
+      expected = {"syntax": {"single_tags": ["br"], "group_tags": ["b", "i"]}}
+      self.assertEqual(load_config(path), expected)
+      cache_path = path + CONFIG_CACHE_SUFFIX
+      # 一時ファイルは残らない
+      self.assertEqual(sorted(os.listdir(tmpdir)), ["syntax-config.yaml", "syntax-config.yaml" + CONFIG_CACHE_SUFFIX])
+      # YAML の更新時刻とサイズが一致していればキャッシュの内容が使われる
+      with open(cache_path, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+      cache["config"]["syntax"]["group_tags"] = ["u"]
+      with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+      self.assertEqual(load_config(path)["syntax"]["group_tags"], ["u"])
+
+  def test_load_config_ignores_cache_for_older_yaml(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      path = os.path.join(tmpdir, "syntax-config.yaml")
+      self._write_config(path, "b, i")
+      load_config(path)
+      # cp -p のように、更新時刻がキャッシュより古い YAML に差し替える
+      self._write_config(path, "b, i, zz")
+      st = os.stat(path + CONFIG_CACHE_SUFFIX)
+      os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+      self.assertEqual(load_config(path)["syntax"]["group_tags"], ["b", "i", "zz"])
+      with open(path + CONFIG_CACHE_SUFFIX, "r", encoding="utf-8") as f:
+        self.assertEqual(json.load(f)["config"]["syntax"]["group_tags"], ["b", "i", "zz"])
+
 
 ##############################
 # メイン処理（argparse を用いた通常の実行およびテスト実行）
 ##############################
+# 1 ファイル分のチェック（ワーカープロセスでも実行されるのでモジュール直下に置く）
+# 戻り値は (パス, 結果, エラーメッセージ または None, 読み込みに失敗したか)
+def _check_file(path: str, single_tags: Set[str], group_tags: Set[str]):
+  # DSL ファイルを UTF-8 で読み込み
+  try:
+    with open(path, "r", encoding="utf-8") as infile:
+      dsl_code = infile.read()
+  except Exception as e:
+    return path, False, f"入力ファイルの読み込みに失敗しました: {e}", True
+
+  try:
+    return path, check_syntax_fast(dsl_code, single_tags, group_tags, raise_exception=True), None, False
+  except DSLSyntaxError as e:
+    return path, False, _format_error(e.line, e.col, e.message, e.stack), False
+
 def main():
   parser = argparse.ArgumentParser(description="DSL Syntax Checker")
   parser.add_argument("--test", action="store_true", help="Run unit tests")
   parser.add_argument("-c", "--config", default="syntax-config.yaml",
             help="Path to configuration YAML file (default: syntax-config.yaml)")
-  parser.add_argument("input_file", nargs="?", help="Path to the DSL file to check")
+  parser.add_argument("input_file", nargs="*",
+            help="Paths (or glob patterns) of the DSL files to check")
   args = parser.parse_args()
 
   if args.test:
@@ -306,36 +789,56 @@ def main():
     unittest.main()
   else:
     # positional argument の input_file が必須
-    if args.input_file is None:
+    if not args.input_file:
       parser.error("Input file is required when not running tests.")
 
+    # シェルが展開しない環境のため、ワイルドカードはここで展開する
+    # 実在するパスはそのまま使い、存在せずワイルドカードを含むものだけ展開する
+    files = []
+    for pattern in args.input_file:
+      if not os.path.exists(pattern) and glob.has_magic(pattern):
+        files.extend(sorted(glob.glob(pattern, recursive=True)) or [pattern])
+      else:
+        files.append(pattern)
+
     # 設定用 YAML ファイルを読み込み
     try:
-      with open(args.config, "r", encoding="utf-8") as config_file:
-        config = yaml.safe_load(config_file)
+      config = load_config(args.config)
     except Exception as e:
       print(f"設定ファイルの読み込みに失敗しました: {e}")
       sys.exit(1)
 
     try:
-      group_tags = set(config["syntax"]["group_tags"])
-      single_tags = set(config["syntax"]["single_tags"])
+      group_tags = frozenset(config["syntax"]["group_tags"])
+      single_tags = frozenset(config["syntax"]["single_tags"])
     except KeyError as e:
       print(f"設定ファイルの形式が正しくありません。キーが不足しています: {e}")
       sys.exit(1)
 
-    # DSL ファイルを UTF-8 で読み込み
-    try:
-      with open(args.input_file, "r", encoding="utf-8") as infile:
-        dsl_code = infile.read()
-    except Exception as e:
-      print(f"入力ファイルの読み込みに失敗しました: {e}")
+    # チェックを実行。複数ファイルはプロセスプールで並列に処理する（結果は入力順）
+    if len(files) == 1:
+      results = [_check_file(files[0], single_tags, group_tags)]
+    else:
+      # Windows の ProcessPoolExecutor は 61 を超えるワーカー数を受け付けない
+      workers = min(os.cpu_count() or 1, 61)
+      chunksize = max(1, len(files) // (workers * 4))
+      with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_check_file, files, repeat(single_tags), repeat(group_tags),
+                                    chunksize=chunksize))
+
+    read_failed = False
+    for path, result, err_msg, io_error in results:
+      prefix = f"{path}: " if len(files) > 1 else ""
+      if err_msg is not None:
+        for line in err_msg.split("\n"):
+          print(prefix + line)
+      if io_error:
+        read_failed = True
+      else:
+        print(prefix + ("Syntax OK" if result else "Syntax Error"))
+    if read_failed:
       sys.exit(1)
 
-    # チェックを実行
-    result = check_syntax(dsl_code, single_tags, group_tags)
-    print("Syntax OK" if result else "Syntax Error")
-
 
 if __name__ == "__main__":
   main()